@@ -1,6 +1,21 @@
 __version__ = "0.1.0"
 
-from .pages import IndexPage, ContentPage
-from .paginator import Paginator
-from .hyde import Hyde
-from .errors import HydeError
\ No newline at end of file
+# Public classes are imported on first access, so that `import hyde` stays cheap.
+_EXPORTS = {
+    "IndexPage": "hyde.pages",
+    "ContentPage": "hyde.pages",
+    "Paginator": "hyde.paginator",
+    "Hyde": "hyde.hyde",
+    "HydeError": "hyde.errors",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'hyde' has no attribute '{name}'")
+
+    import importlib
+
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
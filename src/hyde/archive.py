@@ -0,0 +1,117 @@
+""" Site archives
+
+This file contains the writers used by `hyde gen --archive` to stream a generated
+site straight into a tar or zip archive instead of writing it to the output directory.
+
+Archives are reproducible: every entry gets the same timestamp, owner and permissions,
+so building the same site twice produces byte-identical archives that can be
+compared by hash. Entry ordering is up to the caller.
+"""
+import gzip
+import io
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+
+from hyde.errors import HydeError
+
+# zip can't represent dates before 1980, use that as the fixed timestamp for all entries
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ARCHIVE_MTIME = 315532800
+ARCHIVE_FILE_MODE = 0o644
+
+
+class SiteArchive(object):
+    """ Base class for archives that generated pages and static assets are streamed into """
+    def __init__(self, path: Path):
+        """
+        :param path: path of the archive file to create
+        """
+        self.path = Path(path)
+
+    def add_bytes(self, arcname: str, data: bytes):
+        raise NotImplementedError("add_bytes should be implemented in child classes!")
+
+    def add_file(self, arcname: str, path: Path):
+        raise NotImplementedError("add_file should be implemented in child classes!")
+
+    def close(self):
+        raise NotImplementedError("close should be implemented in child classes!")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TarSiteArchive(SiteArchive):
+    """ Writes a (optionally gzip compressed) tar archive """
+    def __init__(self, path: Path, compress: bool = False):
+        super().__init__(path)
+        self._fp = open(self.path, "wb")
+        self._gz = None
+        fileobj = self._fp
+        if compress:
+            # GzipFile stores the filename and current time in its header by default
+            self._gz = gzip.GzipFile(filename="", mode="wb", fileobj=self._fp, mtime=0)
+            fileobj = self._gz
+        self._tar = tarfile.open(fileobj=fileobj, mode="w", format=tarfile.PAX_FORMAT)
+
+    def _tarinfo(self, arcname: str, size: int) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(arcname)
+        info.size = size
+        info.mtime = ARCHIVE_MTIME
+        info.mode = ARCHIVE_FILE_MODE
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def add_bytes(self, arcname: str, data: bytes):
+        self._tar.addfile(self._tarinfo(arcname, len(data)), io.BytesIO(data))
+
+    def add_file(self, arcname: str, path: Path):
+        with open(path, "rb") as fp:
+            self._tar.addfile(self._tarinfo(arcname, Path(path).stat().st_size), fp)
+
+    def close(self):
+        self._tar.close()
+        if self._gz is not None:
+            self._gz.close()
+        self._fp.close()
+
+
+class ZipSiteArchive(SiteArchive):
+    """ Writes a deflate compressed zip archive """
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._zip = zipfile.ZipFile(self.path, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def _zipinfo(self, arcname: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(arcname, date_time=ARCHIVE_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = ARCHIVE_FILE_MODE << 16
+        return info
+
+    def add_bytes(self, arcname: str, data: bytes):
+        self._zip.writestr(self._zipinfo(arcname), data)
+
+    def add_file(self, arcname: str, path: Path):
+        with open(path, "rb") as src, self._zip.open(self._zipinfo(arcname), "w") as dst:
+            shutil.copyfileobj(src, dst)
+
+    def close(self):
+        self._zip.close()
+
+
+def open_archive(path: Path) -> SiteArchive:
+    """ Create an archive writer matching the file extension of path """
+    name = Path(path).name
+    if name.endswith((".tar.gz", ".tgz")):
+        return TarSiteArchive(path, compress=True)
+    if name.endswith(".tar"):
+        return TarSiteArchive(path)
+    if name.endswith(".zip"):
+        return ZipSiteArchive(path)
+    raise HydeError(f"Unsupported archive format '{name}', use .tar, .tar.gz, .tgz or .zip")
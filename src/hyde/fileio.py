@@ -0,0 +1,110 @@
+""" Bulk file I/O
+
+This file contains helpers to read and write many files concurrently. On network
+file systems, generating a site is dominated by the latency of each open, read
+and write rather than by rendering, so these run on a thread pool with a bounded
+number of operations in flight. All builds in a process share one thread pool.
+"""
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MAX_IN_FLIGHT = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """ The thread pool shared by all I/O in this process, created on first use """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="hyde-io")
+        return _executor
+
+
+def _bounded_map(fn: Callable[[T], R], items: Iterable[T], max_in_flight: int) -> list[R]:
+    """ Like ThreadPoolExecutor.map, but never submits more than max_in_flight calls at once """
+    executor = _get_executor()
+    results = []
+    pending = {}
+    try:
+        for i, item in enumerate(items):
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results.append((pending.pop(future), future.result()))
+            pending[executor.submit(fn, item)] = i
+        for future in wait(pending).done:
+            results.append((pending[future], future.result()))
+    except BaseException:
+        # the pool is shared, don't leave calls of a failed batch running in it
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        raise
+
+    results.sort(key=lambda result: result[0])
+    return [result for _, result in results]
+
+
+def _read_file(path: Path) -> str:
+    with open(path, "r") as fp:
+        return fp.read()
+
+
+def _write_file(item: tuple[Path, str]):
+    path, content = item
+    with open(path, "w") as fp:
+        fp.write(content)
+
+
+def read_files(paths: list[Path], max_in_flight: int = MAX_IN_FLIGHT) -> list[str]:
+    """
+    Read the text of all files concurrently.
+
+    :param paths: files to read
+    :param max_in_flight: maximum number of files being read at the same time
+    :return: contents of the files, in the same order as paths
+    """
+    return _bounded_map(_read_file, paths, max_in_flight)
+
+
+def _copy_file(item: tuple[Path, Path]):
+    src, dst = item
+    shutil.copy2(src, dst)
+
+
+def _make_parent_dirs(paths: Iterable[Path]):
+    # create each directory once upfront, rather than once per file from every thread
+    for directory in sorted({path.parent for path in paths}):
+        os.makedirs(directory, exist_ok=True)
+
+
+def write_files(files: list[tuple[Path, str]], max_in_flight: int = MAX_IN_FLIGHT):
+    """
+    Write text to all files concurrently, creating parent directories as needed.
+
+    :param files: tuples of the path to write and the text to write to it
+    :param max_in_flight: maximum number of files being written at the same time
+    """
+    _make_parent_dirs(path for path, _ in files)
+    _bounded_map(_write_file, files, max_in_flight)
+
+
+def copy_files(files: list[tuple[Path, Path]], max_in_flight: int = MAX_IN_FLIGHT):
+    """
+    Copy files concurrently, creating parent directories of the destinations as needed.
+
+    :param files: tuples of the source path and the destination path
+    :param max_in_flight: maximum number of files being copied at the same time
+    """
+    _make_parent_dirs(dst for _, dst in files)
+    _bounded_map(_copy_file, files, max_in_flight)
@@ -7,12 +7,12 @@ from pathlib import Path
 from typing import Callable
 import copy
 
-import yaml
-import jinja2
-
-from hyde.server import HydeServer
+# jinja2 and the archive/server modules are imported where they are needed, so that
+# subcommands like `hyde new` don't pay for importing the whole rendering stack.
+from hyde.fileio import read_files, write_files, copy_files
 from hyde.pages import ContentPage, Page
 from hyde.paginator import Paginator
+from hyde.related import RelatedIndex
 from hyde.errors import HydeError
 
 
@@ -31,31 +31,114 @@ logger.setLevel(logging.DEBUG)
 
 
 class Hyde(object):
-    def __init__(self):
-        self.template_dir = Path(".").joinpath(TEMPLATE_DIR)
-        self.content_dir = Path(".").joinpath(CONTENT_DIR)
-        self.static_dir = Path(".").joinpath(STATIC_DIR)
-        self.output_dir = Path(".").joinpath(OUTPUT_DIR)
-        config_file_path = Path(".").joinpath(CONFIG_FILE)
-        self.root_dir = Path(".")
-
-        self.jinja2_env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(self.template_dir),
-        )
+    def __init__(
+        self,
+        root_dir: Path = Path("."),
+        content_dir: str = CONTENT_DIR,
+        url_prefix: str = "",
+        jinja2_envs: dict = None,
+        locale: str = None,
+    ):
+        """
+        :param root_dir: path to the root of the hyde project
+        :param content_dir: directory of the content of this site, relative to root_dir
+        :param url_prefix: prepended to the URLs of all pages, such as '/de' for a locale
+        :param jinja2_envs: jinja2 environments by template directory, to share them between sites
+        :param locale: name of the locale if this site is one of several locales of the project
+        """
+        self.root_dir = Path(root_dir)
+        self.template_dir = self.root_dir.joinpath(TEMPLATE_DIR)
+        self.content_dir = self.root_dir.joinpath(content_dir)
+        self.static_dir = self.root_dir.joinpath(STATIC_DIR)
+        self.output_dir = self.root_dir.joinpath(OUTPUT_DIR)
+        self.url_prefix = url_prefix
+        self.locale = locale
+
+        # sites using the same templates share one environment and its compiled templates
+        jinja2_envs = {} if jinja2_envs is None else jinja2_envs
+        template_key = self.template_dir.resolve()
+        if template_key not in jinja2_envs:
+            import jinja2
+
+            jinja2_envs[template_key] = jinja2.Environment(
+                loader=jinja2.FileSystemLoader(self.template_dir),
+            )
+        self.jinja2_env = jinja2_envs[template_key]
+        # kept across calls to generate(), so regenerating only re-indexes changed pages
+        self.related_index = RelatedIndex()
+
+    @classmethod
+    def from_config(cls, root_dir: Path = Path("."), jinja2_envs: dict = None) -> list["Hyde"]:
+        """
+        Create a Hyde for each locale in the config file of the project at root_dir,
+        or a single one if no locales are configured. Locales are listed like:
+
+            locales:
+              - name: en
+                content: content  # defaults to 'content-<name>'
+                url-prefix: /     # defaults to '/<name>'
+              - name: de
+
+        :param root_dir: path to the root of the hyde project
+        :param jinja2_envs: jinja2 environments by template directory, to share them between sites
+        :return: list of sites, all writing to the output directory of the project
+        """
+        config_file = Path(root_dir).joinpath(CONFIG_FILE)
+        config = {}
+        if config_file.is_file():
+            import yaml
+
+            with open(config_file, "r") as f:
+                config = yaml.safe_load(f) or {}
+
+        jinja2_envs = {} if jinja2_envs is None else jinja2_envs
+        if not (locales := config.get("locales")):
+            return [cls(root_dir, jinja2_envs=jinja2_envs)]
+
+        sites = []
+        locales_by_prefix = {}
+        for locale in locales:
+            if "name" not in locale:
+                raise HydeError(f"Every locale in '{config_file}' needs a name, got {locale}")
+            name = locale["name"]
+            prefix = str(locale.get("url-prefix", name)).strip("/")
+            url_prefix = f"/{prefix}" if prefix else ""
+
+            # locales share the output directory, so their URLs must not overlap
+            if prefix == STATIC_DIR:
+                raise HydeError(f"Locale '{name}' in '{config_file}' can't use the URL prefix of the static assets")
+            if (other := locales_by_prefix.get(url_prefix)) is not None:
+                raise HydeError(
+                    f"Locales '{other}' and '{name}' in '{config_file}' have the same URL prefix '{url_prefix or '/'}'"
+                )
+            locales_by_prefix[url_prefix] = name
+
+            sites.append(
+                cls(
+                    root_dir,
+                    content_dir=locale.get("content", f"{CONTENT_DIR}-{name}"),
+                    url_prefix=url_prefix,
+                    jinja2_envs=jinja2_envs,
+                    locale=name,
+                )
+            )
+        return sites
 
     def _find_files(self, subdir: Path, filter_fn: Callable[[Path], bool]):
-        """ Find files that match the given filter function in subdir """
-        search_dir = self.root_dir.joinpath(subdir)
+        """ Find files that match the given filter function in subdir, sorted by their path """
+        search_dir = Path(subdir)
         matches = []
         for dirpath, dirnames, files in os.walk(search_dir):
             for f in files:
                 if filter_fn(Path(f)):
                     matches.append(Path(dirpath).joinpath(f))
-        return matches
+        # os.walk order depends on the filesystem, sort so that builds are reproducible
+        return sorted(matches)
 
-    def __copy_static(self):
+    def _copy_static(self):
         dest_dir = self.output_dir.joinpath(STATIC_DIR)
-        shutil.copytree(self.static_dir, dest_dir, dirs_exist_ok=True)
+        static_files = self._find_files(self.static_dir, lambda x: True)
+        copy_files([(f, dest_dir / f.relative_to(self.static_dir)) for f in static_files])
 
     def _sort_content_pages(self, content_pages: list[Page]) -> tuple[list[Page], dict[str, list[Page]]]:
         """ Sort content pages into those that are paginated and those that are not """
@@ -72,21 +155,27 @@ class Hyde(object):
                 unpaginated_content.append(page)
         return unpaginated_content, paginated_content
 
-    def _write_content_to_file(self, content: str, path: Path):
-        os.makedirs(path.parent, exist_ok=True)
-        with open(path, "w") as fp:
-            fp.write(content)
+    def _build_navbar_pages(self, single_pages, paginated_pages) -> list[Page]:
+        """ Navbar links point to all unpaginated pages and the first index of each paginator """
+        navbar_pages = copy.deepcopy(single_pages)
+
+        for content_type, pages in paginated_pages.items():
+            paginator = Paginator(name=content_type, content=pages, url_prefix=self.url_prefix)
+            index = next(paginator)
+            navbar_pages.append(index)
+        return navbar_pages
 
     def _render_content_to_html(self, single_pages, paginated_pages) -> list[tuple[str, Path]]:
         rendered_pages = []
 
         # Build navbar links
-        navbar_pages = copy.deepcopy(single_pages)
+        navbar_pages = self._build_navbar_pages(single_pages, paginated_pages)
 
-        for content_type, pages in paginated_pages.items():
-            paginator = Paginator(name=content_type, content=pages)
-            index = next(paginator)
-            navbar_pages.append(index)
+        paginators = {
+            content_type: Paginator(name=content_type, content=pages, url_prefix=self.url_prefix)
+            for content_type, pages in paginated_pages.items()
+        }
+        self.related_index.update([p for paginator in paginators.values() for p in paginator.content])
 
         # All content that's not paginated is accessible via the navigation bar.
         # Render and write pages required for navigation links.
@@ -95,9 +184,7 @@ class Hyde(object):
             rendered_pages.append((page, page_html, page.html_path))
 
         # Render and write paginated pages 
-        for content_type, pages in paginated_pages.items():
-            paginator = Paginator(name=content_type, content=pages)
-
+        for paginator in paginators.values():
             for index in paginator:
                 index_html = index.render(self.jinja2_env, paginator, nav_bar_pages=navbar_pages)
                 rendered_pages.append((index, index_html, index.html_path))
@@ -112,38 +199,69 @@ class Hyde(object):
 
         return rendered_pages
 
-    def generate(self):
-        self.check()
-
-        # remove previous output directory if it exists
-        if self.output_dir.exists():
-            shutil.rmtree(self.output_dir)
-
-         # find all content files and instantiate them into Pages
+    def _load_content(self) -> tuple[list[Page], dict[str, list[Page]]]:
+        # find all content files and instantiate them into Pages
         content_files = self._find_files(self.content_dir, lambda x: x.suffix == ".md")
-        content_pages = [ContentPage.from_file(f, self.content_dir) for f in content_files]
+        content_texts = read_files(content_files)
+        content_pages = [ContentPage.from_text(t, f, self.content_dir) for t, f in zip(content_texts, content_files)]
 
         # sort content into pages reachable through a paginator (such as blog posts)
         # and pages available through the website navigation links (about, contact, home)
         navbar_content, paginated_content = self._sort_content_pages(content_pages)
 
-        # instantiate pages and render HTML
-        rendered_pages = self._render_content_to_html(navbar_content, paginated_content)
+        # paginated pages get the URL prefix from their paginator
+        for page in navbar_content:
+            page.url = f"{self.url_prefix}{page.url}"
+        return navbar_content, paginated_content
 
-        # write rendered HTML to files
-        for _, html, html_path in rendered_pages:
-            html_path = self.output_dir / html_path
-            self._write_content_to_file(html, html_path)
+    def _render_site(self) -> list[tuple[Page, str, Path]]:
+        navbar_content, paginated_content = self._load_content()
 
-        # copy static assets
-        self.__copy_static()
+        # instantiate pages and render HTML
+        return self._render_content_to_html(navbar_content, paginated_content)
+
+    def _write_archive(self, rendered_pages: list[tuple[Page, str, Path]], archive_path: Path):
+        """ Stream rendered pages and static assets into an archive, sorted by their path """
+        from hyde.archive import open_archive
+
+        entries = [(html_path.as_posix(), html) for _, html, html_path in rendered_pages]
+        if self.static_dir.is_dir():
+            static_files = self._find_files(self.static_dir, lambda x: True)
+            entries += [(Path(STATIC_DIR, f.relative_to(self.static_dir)).as_posix(), f) for f in static_files]
+        entries.sort(key=lambda entry: entry[0])
+
+        with open_archive(archive_path) as archive:
+            for arcname, source in entries:
+                if isinstance(source, str):
+                    archive.add_bytes(arcname, source.encode("utf-8"))
+                else:
+                    archive.add_file(arcname, source)
+
+        logger.info(f"Wrote {len(entries)} files to '{archive_path}'.")
+
+    def generate(self, archive_path: Path = None):
+        """
+        Render the site into the output directory.
+
+        The output directory is replaced, so sites of a project with several locales
+        can't be generated on their own. Use generate_sites with all of them instead.
+
+        :param archive_path: if given, write the site into this .tar, .tar.gz, .tgz or .zip
+                             archive instead and leave the output directory untouched.
+        """
+        if self.locale is not None:
+            raise HydeError(
+                f"Site of locale '{self.locale}' shares its output directory with the other locales, "
+                "generate them together with generate_sites(Hyde.from_config())"
+            )
+        generate_sites([self], archive_path=archive_path)
 
     def check(self):
         checks = []
         if not os.path.isdir(self.template_dir):
-            checks.append(f"\tproject is missing the '{TEMPLATE_DIR}' directory")
+            checks.append(f"\tproject is missing the '{self.template_dir}' directory")
         if not os.path.isdir(self.content_dir):
-            checks.append(f"\tproject is missing the '{CONTENT_DIR}' directory")
+            checks.append(f"\tproject is missing the '{self.content_dir}' directory")
         
         if len(checks) > 0:
             raise HydeError(
@@ -171,6 +289,62 @@ class Hyde(object):
         logger.info(f"Done!")
 
 
+def _render_output(output_sites: list[Hyde]) -> list[tuple[Page, str, Path]]:
+    """ Render sites sharing an output directory, making sure no two of them write the same file """
+    owners = {}
+    for f in output_sites[0]._find_files(output_sites[0].static_dir, lambda x: True):
+        owners[Path(STATIC_DIR, f.relative_to(output_sites[0].static_dir))] = "the static assets"
+
+    rendered_pages = []
+    for site in output_sites:
+        name = f"locale '{site.locale}'" if site.locale is not None else f"site '{site.root_dir}'"
+        site_pages = site._render_site()
+        for _, _, html_path in site_pages:
+            if (owner := owners.get(html_path, name)) != name:
+                raise HydeError(f"Both {owner} and {name} write '{html_path}' in '{site.output_dir}'")
+            owners[html_path] = name
+        rendered_pages += site_pages
+    return rendered_pages
+
+
+def generate_sites(sites: list[Hyde], archive_path: Path = None):
+    """
+    Render several sites in one process. Sites sharing an output directory, such as
+    the locales of a project, are written to it together.
+
+    :param sites: sites to render, e.g. created by Hyde.from_config
+    :param archive_path: if given, write the sites into this .tar, .tar.gz, .tgz or .zip
+                         archive instead. All sites must belong to the same project.
+    :raises HydeError: if two sites, or a site and the static assets, would write the same file
+    """
+    for site in sites:
+        site.check()
+
+    sites_by_output = {}
+    for site in sites:
+        sites_by_output.setdefault(site.output_dir.resolve(), []).append(site)
+
+    if archive_path is not None:
+        if len(sites_by_output) > 1:
+            raise HydeError("Only the sites of a single project can be written to an archive")
+        sites[0]._write_archive(_render_output(sites), Path(archive_path))
+        return
+
+    for output_sites in sites_by_output.values():
+        output_dir = output_sites[0].output_dir
+        rendered_pages = _render_output(output_sites)
+
+        # remove previous output directory if it exists
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+
+        # write rendered HTML to files
+        write_files([(output_dir / html_path, html) for _, html, html_path in rendered_pages])
+
+        # copy static assets
+        output_sites[0]._copy_static()
+
+
 def cli():
     parser = argparse.ArgumentParser(
         prog="hyde", description="A pytastic static website generator"
@@ -184,8 +358,19 @@ def cli():
 
     parser_serve = subparsers.add_parser("serve", help="serve Hyde website locally")
     parser_serve.add_argument("-p", "--port", help="port to serve on", default=8000)
+    parser_serve.add_argument(
+        "--on-demand",
+        action="store_true",
+        help="render pages when they are first requested instead of generating the whole site upfront",
+    )
 
-    _ = subparsers.add_parser("gen", help="generate static html sites")
+    parser_gen = subparsers.add_parser("gen", help="generate static html sites")
+    parser_gen.add_argument(
+        "projects", nargs="*", default=["."], help="directories of the Hyde projects to generate"
+    )
+    parser_gen.add_argument(
+        "-a", "--archive", help="write the site to a .tar, .tar.gz, .tgz or .zip archive instead of the output directory"
+    )
 
     args = parser.parse_args()
 
@@ -193,10 +378,23 @@ def cli():
     if args.subcommand == "new":
         Hyde.new_site(args.directory)
     if args.subcommand == "serve":
-        h = Hyde()
-        h.generate()
-        s = HydeServer(h.output_dir, h.root_dir, h.generate)
+        from hyde.server import HydeServer
+        from hyde.ondemand import OnDemandProject
+
+        sites = Hyde.from_config()
+        root_dir = sites[0].root_dir
+        if args.on_demand:
+            # static assets are served straight from the project, pages are rendered on request
+            for site in sites:
+                site.check()
+            project = OnDemandProject(sites)
+            s = HydeServer(sites[0].static_dir, root_dir, project.invalidate, render=project.render)
+        else:
+            generate_sites(sites)
+            s = HydeServer(sites[0].output_dir, root_dir, lambda: generate_sites(sites))
         s.serve(port=args.port)
     if args.subcommand == "gen":
-        h = Hyde()
-        h.generate()
+        # all projects share jinja2 environments, the markdown cache and the I/O thread pool
+        jinja2_envs = {}
+        sites = [site for project in args.projects for site in Hyde.from_config(project, jinja2_envs)]
+        generate_sites(sites, archive_path=args.archive)
@@ -0,0 +1,122 @@
+""" On-demand rendering
+
+This file contains the OnDemandSite used by `hyde serve --on-demand`. Instead of
+generating the whole site before the development server starts, only the front
+matter of the content files is read to build a routing table from URLs to pages
+and paginator indices. Each page is rendered the first time it is requested and
+kept in a LRU cache, which is cleared whenever files in the project change.
+"""
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Optional
+
+from hyde.pages import Page, IndexPage
+from hyde.paginator import Paginator
+
+
+class OnDemandSite(object):
+    """ Renders the pages of a hyde project as they are requested """
+    def __init__(self, hyde, cache_size: int = 256):
+        """
+        :param hyde: the Hyde project to render pages from
+        :param cache_size: maximum number of rendered pages to keep in memory
+        """
+        self.hyde = hyde
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_routes()
+
+    def _build_routes(self):
+        """ Map the URL of every page and paginator index to the page that renders it """
+        single_pages, paginated_pages = self.hyde._load_content()
+        self._paginated_pages = paginated_pages
+        self._navbar_pages = self.hyde._build_navbar_pages(single_pages, paginated_pages)
+
+        self._routes = {}
+        for page in single_pages:
+            self._routes[page.url] = page
+
+        paginators = [
+            Paginator(name=content_type, content=pages, url_prefix=self.hyde.url_prefix)
+            for content_type, pages in paginated_pages.items()
+        ]
+        # related pages are only needed once a content page is rendered
+        self._related_pages = [p for paginator in paginators for p in paginator.content]
+        self._related_ready = False
+
+        for paginator in paginators:
+            for index in paginator:
+                self._routes[index.url] = index
+                for page in index.items:
+                    self._routes[page.url] = page
+
+    @property
+    def urls(self) -> list[str]:
+        return list(self._routes.keys())
+
+    def _render_page(self, page: Page) -> str:
+        if isinstance(page, IndexPage):
+            # index pages need a paginator positioned at their own index for prev/next links
+            paginator = Paginator(
+                name=page.meta.title,
+                content=self._paginated_pages[page.meta.title],
+                url_prefix=self.hyde.url_prefix,
+            )
+            index = next(islice(paginator, page.number, None))
+            return index.render(self.hyde.jinja2_env, paginator, nav_bar_pages=self._navbar_pages)
+        if page.meta.content_group is not None and not self._related_ready:
+            self.hyde.related_index.update(self._related_pages)
+            self._related_ready = True
+        return page.render(self.hyde.jinja2_env, nav_bar_pages=self._navbar_pages)
+
+    def render(self, url: str) -> Optional[str]:
+        """
+        Render the page at the given URL, or return a cached copy.
+
+        :param url: absolute URL path, such as '/posts/' or '/posts/index2.html'
+        :return: the rendered HTML, or None if no page exists at url
+        """
+        if url.endswith("/"):
+            url = f"{url}index.html"
+
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                return self._cache[url]
+
+            if (page := self._routes.get(url)) is None:
+                return None
+
+            html = self._render_page(page)
+            self._cache[url] = html
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return html
+
+    def invalidate(self):
+        """ Re-read the front matter of all content and drop all rendered pages """
+        with self._lock:
+            self._cache.clear()
+            self._build_routes()
+
+
+class OnDemandProject(object):
+    """ Renders the pages of all sites of a project, such as its locales, as they are requested """
+    def __init__(self, sites: list, cache_size: int = 256):
+        """
+        :param sites: the Hyde sites of the project, which must not share any URLs
+        :param cache_size: maximum number of rendered pages to keep in memory per site
+        """
+        self.sites = [OnDemandSite(site, cache_size=cache_size) for site in sites]
+
+    def render(self, url: str) -> Optional[str]:
+        for site in self.sites:
+            if (html := site.render(url)) is not None:
+                return html
+        return None
+
+    def invalidate(self):
+        for site in self.sites:
+            site.invalidate()
@@ -1,16 +1,25 @@
 from dataclasses import dataclass
 from datetime import date
-from markdown import markdown
+from functools import lru_cache
 from pathlib import Path
-import yaml
 import sys
 import logging
 
+from hyde.errors import HydeError
+
 METADATA_SEP = "---"
 
 logger = logging.getLogger("hyde")
 
 
+@lru_cache(maxsize=4096)
+def _markdown_to_html(source: str) -> str:
+    """ Convert markdown to HTML, shared by all sites built in this process """
+    from markdown import markdown
+
+    return markdown(source)
+
+
 @dataclass
 class Metadata(object):
     title: str
@@ -20,6 +29,7 @@ class Metadata(object):
     draft: bool = False
     date: date = None
     author: str = None
+    tags: list[str] = None
 
 
 class Page(object):
@@ -50,16 +60,34 @@ class Page(object):
 
 
 class ContentPage(Page):
-    def __init__(self, meta: Metadata, content: str):
+    def __init__(self, meta: Metadata, content: str, source: str = None):
+        """
+        :param meta: page metadata parsed from the front matter
+        :param content: rendered HTML content of the page
+        :param source: markdown source, only converted to HTML when content is first accessed
+        """
         url = f"/{meta.urlstub}.html"
         super().__init__(meta, url)
-        self.content = content
+        self._content = content
+        self._source = source
+        # most similar content pages, filled in by hyde.related.RelatedIndex
+        self.related = []
+
+    @property
+    def content(self):
+        if self._content is None and self._source is not None:
+            self._content = _markdown_to_html(self._source)
+        return self._content
 
     @classmethod
     def from_file(cls, path: Path, root: Path):
         with open(path, "r") as f:
             text = f.read()
+        return cls.from_text(text, path, root)
 
+    @classmethod
+    def from_text(cls, text: str, path: Path, root: Path):
+        """ Parse the already read contents of the content file at path """
         parent = path.relative_to(root).parent
         if len(parent.parts) > 1:
             logger.error(f"Hyde doesn't support nested content!")
@@ -67,6 +95,8 @@ class ContentPage(Page):
             sys.exit(1)
         content_group = None if parent == Path('.') else parent.name
         
+        import yaml
+
         try:
             meta = yaml.load(text.split(METADATA_SEP)[0], Loader=yaml.FullLoader)
             meta = Metadata(**meta, content_group=content_group)
@@ -76,12 +106,11 @@ class ContentPage(Page):
             sys.exit(1)
 
         try:
-            text_content = text.split(METADATA_SEP)[1]
-            content = markdown(text_content)
+            source = text.split(METADATA_SEP)[1]
         except IndexError:
-            content = None
+            source = None
 
-        return cls(meta, content)
+        return cls(meta, None, source=source)
 
     def render(self, jinja2_env, nav_bar_pages):
         """writes html files to output directory"""
@@ -94,11 +123,11 @@ class ContentPage(Page):
 
 
 class IndexPage(Page):
-    def __init__(self, name: str, pages: list[Page], number: int):
+    def __init__(self, name: str, pages: list[Page], number: int, url_prefix: str = ""):
         meta = Metadata(name, urlstub="index")
         self._items = pages
         self._number = number
-        url = f"/{meta.title}/index{self._number + 1 if self._number > 0 else ''}.html"
+        url = f"{url_prefix}/{meta.title}/index{self._number + 1 if self._number > 0 else ''}.html"
         super().__init__(meta, url)
 
     @property
@@ -2,14 +2,15 @@ import math
 from itertools import tee, islice, chain
 import copy
 
-from hyde import IndexPage, ContentPage
+from hyde.pages import IndexPage, ContentPage
 
 
 class Paginator(object):
-    def __init__(self, name: str, content: list[ContentPage], items_per_page: int = 10):
+    def __init__(self, name: str, content: list[ContentPage], items_per_page: int = 10, url_prefix: str = ""):
         self._content = copy.deepcopy(content)
         self._items_per_page = items_per_page
         self._name = name
+        self._url_prefix = url_prefix
 
         self._number_pages = math.ceil(len(content) / self._items_per_page)
         self._prev = self._current = self._next = None
@@ -18,12 +19,16 @@ class Paginator(object):
 
         # rewrite URLs of member content pages
         for p in self._content:
-            p.url = f"/{name}{p.url}"
+            p.url = f"{url_prefix}/{name}{p.url}"
 
     @property
     def number_pages(self):
         return self._number_pages
 
+    @property
+    def content(self):
+        return self._content
+
     @property
     def name(self):
         return self._name
@@ -46,7 +51,7 @@ class Paginator(object):
 
     @property
     def url(self):
-        return f"/{self._name}/"
+        return f"{self._url_prefix}/{self._name}/"
 
     def _build_indices(self):
         indices = []
@@ -55,9 +60,9 @@ class Paginator(object):
             end_index = (index_number + 1) * self._items_per_page
 
             try:
-                index = IndexPage(self._name, self._content[start_index:end_index], index_number)
+                index = IndexPage(self._name, self._content[start_index:end_index], index_number, self._url_prefix)
             except IndexError:
-                index = IndexPage(self._name, self._content[start_index:], index_number)
+                index = IndexPage(self._name, self._content[start_index:], index_number, self._url_prefix)
             indices.append(index)
         return indices
 
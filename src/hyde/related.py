@@ -0,0 +1,218 @@
+""" Related pages
+
+This file contains the RelatedIndex, which finds the pages most similar to each
+content page so templates can link to them through `page.related`.
+
+Every page is turned into a sparse TF-IDF vector built from its title, tags and
+markdown body. Terms in most pages are dropped like stop words, unless they come
+from tags. Only the tags and the highest weighted terms of a page go into the
+inverted index, and only the highest weighted pages of each posting list are
+looked at, which bounds the candidates found for each page. The most promising
+candidates are then scored exactly against the full vectors.
+
+IDF weights are frozen after a full build. When pages change, only the changed
+pages are scored against the index, and since similarity is symmetric their scores
+also update the neighbours of all other pages. The index is rebuilt from scratch
+once a large enough share of the pages has changed.
+"""
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from hyde.pages import ContentPage
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its of on or that the this to was "
+    "were what when where which who will with you your".split()
+)
+TITLE_WEIGHT = 2
+TAG_WEIGHT = 3
+
+# highest weighted terms of a page indexed to find candidates, in addition to its tags
+MAX_TERMS = 25
+# terms in a larger share of pages than this are as uninformative as stop words
+MAX_DOC_FREQ_RATIO = 0.5
+# pages per term that are considered as neighbours, highest weights first
+MAX_POSTINGS = 200
+# candidates per page, by their similarity on indexed terms, that are scored exactly
+MAX_RESCORED = 50
+# neighbours remembered per page, relative to top_k, to replace neighbours that are removed
+CANDIDATE_FACTOR = 2
+# share of pages that may change before IDF weights are recomputed from scratch
+REBUILD_RATIO = 0.25
+
+
+def _tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS and len(t) > 1]
+
+
+def _page_hash(page: ContentPage) -> str:
+    h = hashlib.sha1()
+    for part in [page.meta.title, *(page.meta.tags or []), page._source or ""]:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class RelatedIndex(object):
+    """ Assigns the most similar pages to the `related` attribute of content pages """
+    def __init__(self, top_k: int = 5):
+        """
+        :param top_k: maximum number of related pages per page
+        """
+        self.top_k = top_k
+        self._term_counts = {}
+        # IDF weights of the last full build, too common terms have a weight of 0
+        self._idf = {}
+        self._default_idf = 0.0
+        self._vectors = {}
+        self._indexed_terms = {}
+        self._postings = defaultdict(dict)
+        self._top_postings = {}
+        # best (score, page hash) pairs per page hash, sorted by descending score
+        self._candidates = {}
+        self._changes = 0
+
+    def _terms(self, page: ContentPage, page_hash: str) -> tuple[Counter, frozenset]:
+        """ Weighted term counts and tag terms of a page, cached by the hash of its contents """
+        if (terms := self._term_counts.get(page_hash)) is None:
+            counts = Counter(_tokenize(page._source or ""))
+            for token in _tokenize(page.meta.title):
+                counts[token] += TITLE_WEIGHT
+            tag_terms = frozenset(token for tag in page.meta.tags or [] for token in _tokenize(str(tag)))
+            for token in tag_terms:
+                counts[token] += TAG_WEIGHT
+            terms = self._term_counts[page_hash] = (counts, tag_terms)
+        return terms
+
+    def _vector(self, counts: Counter) -> dict[str, float]:
+        """ Unit length TF-IDF vector of a page """
+        weights = {}
+        for term, count in counts.items():
+            if (idf := self._idf.get(term, self._default_idf)) > 0:
+                weights[term] = (1 + math.log(count)) * idf
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()}
+
+    def _add(self, page_hash: str, counts: Counter, tag_terms: frozenset):
+        vector = self._vectors[page_hash] = self._vector(counts)
+        indexed_terms = [term for term in tag_terms if term in vector]
+        indexed_terms += heapq.nlargest(
+            MAX_TERMS,
+            (term for term in vector if term not in tag_terms),
+            key=lambda term: (vector[term], term),
+        )
+        self._indexed_terms[page_hash] = indexed_terms
+        for term in indexed_terms:
+            self._postings[term][page_hash] = vector[term]
+            self._top_postings.pop(term, None)
+
+    def _remove(self, page_hash: str):
+        del self._vectors[page_hash]
+        for term in self._indexed_terms.pop(page_hash):
+            del self._postings[term][page_hash]
+            self._top_postings.pop(term, None)
+            if not self._postings[term]:
+                del self._postings[term]
+        del self._candidates[page_hash]
+
+    def _top_pages(self, term: str) -> list[str]:
+        """ The pages with the highest weights for term, cached until its postings change """
+        if (pages := self._top_postings.get(term)) is None:
+            postings = self._postings[term]
+            pages = sorted(postings, key=lambda page_hash: (-postings[page_hash], page_hash))[:MAX_POSTINGS]
+            self._top_postings[term] = pages
+        return pages
+
+    def _score(self, page_hash: str) -> dict[str, float]:
+        """ Similarity of a page to the candidates found through the top postings of its indexed terms """
+        vector = self._vectors[page_hash]
+        partial_scores = defaultdict(float)
+        for term in self._indexed_terms[page_hash]:
+            postings = self._postings[term]
+            for other in self._top_pages(term):
+                partial_scores[other] += vector[term] * postings[other]
+        partial_scores.pop(page_hash, None)
+
+        scores = {}
+        for other in heapq.nlargest(MAX_RESCORED, partial_scores, key=lambda o: (partial_scores[o], o)):
+            other_vector = self._vectors[other]
+            scores[other] = sum(vector[term] * other_vector[term] for term in vector.keys() & other_vector.keys())
+        return scores
+
+    def _best(self, candidates) -> list[tuple[float, str]]:
+        return sorted(candidates, key=lambda c: (-c[0], c[1]))[: self.top_k * CANDIDATE_FACTOR]
+
+    def _rebuild(self, term_counts: dict[str, tuple[Counter, frozenset]]):
+        number_pages = len(term_counts)
+        doc_freq = Counter(term for counts, _ in term_counts.values() for term in counts)
+        tag_terms = frozenset().union(*(tags for _, tags in term_counts.values()))
+        max_doc_freq = MAX_DOC_FREQ_RATIO * number_pages
+
+        # tags are what makes pages related, so they are kept however common they are
+        self._idf = {
+            term: math.log(number_pages / freq) if freq <= max_doc_freq or term in tag_terms else 0.0
+            for term, freq in doc_freq.items()
+        }
+        # terms first seen after this build are treated as appearing in a single page
+        self._default_idf = math.log(number_pages) if number_pages else 0.0
+        self._vectors = {}
+        self._indexed_terms = {}
+        self._postings = defaultdict(dict)
+        self._top_postings = {}
+        for page_hash, (counts, tag_terms) in term_counts.items():
+            self._add(page_hash, counts, tag_terms)
+
+        self._candidates = {
+            page_hash: self._best((score, other) for other, score in self._score(page_hash).items())
+            for page_hash in term_counts
+        }
+        self._changes = 0
+
+    def _update_changed(self, added: dict[str, tuple[Counter, frozenset]], removed: list[str]):
+        for page_hash in removed:
+            self._remove(page_hash)
+        if removed:
+            gone = set(removed)
+            for page_hash, candidates in self._candidates.items():
+                self._candidates[page_hash] = [c for c in candidates if c[1] not in gone]
+
+        for page_hash, (counts, tag_terms) in added.items():
+            self._add(page_hash, counts, tag_terms)
+            self._candidates[page_hash] = []
+
+        for page_hash in added:
+            scores = self._score(page_hash)
+            self._candidates[page_hash] = self._best((score, other) for other, score in scores.items())
+            # similarity is symmetric, so the new page may also be a neighbour of the others
+            for other, score in scores.items():
+                if other not in added:
+                    self._candidates[other] = self._best(self._candidates[other] + [(score, page_hash)])
+
+        self._changes += len(added) + len(removed)
+
+    def update(self, pages: list[ContentPage]):
+        """
+        Set `page.related` for all pages to the most similar pages among them.
+
+        Only pages that changed since the previous call are scored, unless so many
+        changed that the index is rebuilt.
+        """
+        page_hashes = [_page_hash(p) for p in pages]
+        pages_by_hash = dict(zip(page_hashes, pages))
+
+        added = [h for h in pages_by_hash if h not in self._vectors]
+        removed = [h for h in self._vectors if h not in pages_by_hash]
+        if added or removed:
+            if not self._vectors or self._changes + len(added) + len(removed) > REBUILD_RATIO * len(pages_by_hash):
+                self._rebuild({h: self._terms(p, h) for h, p in pages_by_hash.items()})
+            else:
+                self._update_changed({h: self._terms(pages_by_hash[h], h) for h in added}, removed)
+            # forget vectors of pages that no longer exist
+            self._term_counts = {h: self._term_counts[h] for h in pages_by_hash}
+
+        for page, page_hash in zip(pages, page_hashes):
+            page.related = [pages_by_hash[other] for _, other in self._candidates[page_hash][: self.top_k]]
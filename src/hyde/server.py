@@ -5,15 +5,31 @@ a server to locally serve your static site.
 
 The FileChangedFunctionHandler is used in conjunction with the `watchdog` package
 to regenerate the site as the files inside the hyde project are edited.
+
+The OnDemandRequestHandler asks a render function for each requested page before
+falling back to serving static assets from disk, which allows serving pages without
+generating the output directory first.
 """
 import http.server
 import socketserver
+import traceback
 from collections.abc import Callable
 from pathlib import Path
-
-from watchdog.events import RegexMatchingEventHandler
+from typing import Optional
+from urllib.parse import urlsplit, unquote
+
+from watchdog.events import (
+    RegexMatchingEventHandler,
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+)
 from watchdog.observers import Observer
 
+# newer watchdog versions also report files being opened and closed, which don't change anything
+CHANGE_EVENT_TYPES = {EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED}
+
 
 class FileChangedFunctionHandler(RegexMatchingEventHandler):
     """ A watchdog handler that calls a given function when changes are detected. """
@@ -22,20 +38,102 @@ class FileChangedFunctionHandler(RegexMatchingEventHandler):
         super().__init__(*args, **kwargs)
 
     def on_any_event(self, event):
+        if event.event_type not in CHANGE_EVENT_TYPES:
+            return
         print(f"Filesystem changed, re-generating!")
         self.fn()
 
 
+class OnDemandRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """ A request handler that renders pages on request and serves static assets from disk """
+    def __init__(self, *args, render: Callable[[str], Optional[str]], static_prefix: str = "/static", **kwargs):
+        """
+        :param render: function rendering the page at a URL path, or returning None if there is no such page
+        :param static_prefix: URL path below which files are served from the directory of the handler,
+                              all other paths that aren't rendered are not found
+        """
+        self.render = render
+        self.static_prefix = static_prefix
+        super().__init__(*args, **kwargs)
+
+    def _is_static(self) -> bool:
+        return urlsplit(self.path).path.startswith(f"{self.static_prefix}/")
+
+    def translate_path(self, path: str) -> str:
+        # the directory holds the static assets themselves, without the prefix
+        return super().translate_path(path[len(self.static_prefix):])
+
+    def _send(self, status: int, content_type: str, body: bytes, head_only: bool):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _send_page(self, head_only: bool) -> bool:
+        """
+        Send the rendered page at the requested path.
+
+        :param head_only: only send the headers, as for a HEAD request
+        :return: False if there is no page at the requested path
+        """
+        path = unquote(urlsplit(self.path).path)
+        try:
+            html = self.render(path)
+            # paginators live at '/<name>/', redirect '/<name>' there like a directory
+            if html is None and not path.endswith("/") and self.render(f"{path}/") is not None:
+                self.send_response(301)
+                self.send_header("Location", f"{path}/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return True
+        except Exception:
+            self._send(500, "text/plain; charset=utf-8", traceback.format_exc().encode("utf-8"), head_only)
+            return True
+
+        if html is None:
+            return False
+        self._send(200, "text/html; charset=utf-8", html.encode("utf-8"), head_only)
+        return True
+
+    def do_GET(self):
+        if self._send_page(head_only=False):
+            return
+        if self._is_static():
+            super().do_GET()
+        else:
+            self.send_error(404, "File not found")
+
+    def do_HEAD(self):
+        if self._send_page(head_only=True):
+            return
+        if self._is_static():
+            super().do_HEAD()
+        else:
+            self.send_error(404, "File not found")
+
+
 class HydeServer(object):
     """ Development server for a hyde project """
-    def __init__(self, serve_dir: Path, root_dir: Path, on_change: Callable[[], None]):
+    def __init__(
+        self,
+        serve_dir: Path,
+        root_dir: Path,
+        on_change: Callable[[], None],
+        render: Callable[[str], Optional[str]] = None,
+    ):
         """
         :param serve_dir: path to directory to serve HTML files from
         :param root_dir: path to the root of the hyde project
         :param on_change: function to call on filesystem changes
+        :param render: function rendering the page at a URL path, or returning None if there
+                       is no such page. If given, serve_dir is the static assets directory and
+                       only URLs below '/static/' are served from it as a fallback.
         """
         self.serve_dir = serve_dir
         self.root_dir = root_dir
+        self.render = render
         self.fs_handler = FileChangedFunctionHandler(
             on_change,
             regexes=[r".*\.[jinja2|html|css|md|yaml]"],
@@ -54,6 +152,10 @@ class HydeServer(object):
         :return: SimpleHTTPRequestHandler instance
         """
         kwargs.pop("directory", None)
+        if self.render is not None:
+            return OnDemandRequestHandler(
+                *args, **kwargs, directory=self.serve_dir, render=self.render
+            )
         return http.server.SimpleHTTPRequestHandler(
             *args, **kwargs, directory=self.serve_dir
         )
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from hyde import Hyde, HydeError
+from hyde.archive import open_archive, ARCHIVE_MTIME
+from .utils import ScaffoldedSiteTestCase
+
+
+POST = """
+author: Hyde
+date: 2021-03-01
+title: Post {number}
+urlstub: post-{number}
+---
+Post number {number}.
+"""
+
+
+_walk = os.walk
+
+
+def reversed_walk(top):
+    for dirpath, dirnames, files in _walk(top):
+        yield dirpath, dirnames, list(reversed(files))
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class TestArchive(ScaffoldedSiteTestCase):
+    def test_open_archive_rejects_unknown_format(self):
+        with self.assertRaises(HydeError):
+            open_archive(Path(self.tmp_dir, "site.rar"))
+
+    def test_generate_tar_gz_archive(self):
+        archive_path = Path(self.tmp_dir, "site.tar.gz")
+        Hyde().generate(archive_path=archive_path)
+
+        self.assertFalse(Path("output").exists())
+        with tarfile.open(archive_path) as tar:
+            members = tar.getmembers()
+        names = [m.name for m in members]
+        self.assertEqual(names, sorted(names))
+        self.assertIn("index.html", names)
+        self.assertIn("posts/my-first-post.html", names)
+        self.assertIn("static/css/style.css", names)
+        self.assertTrue(all(m.mtime == ARCHIVE_MTIME for m in members))
+
+    def test_generate_zip_archive(self):
+        archive_path = Path(self.tmp_dir, "site.zip")
+        Hyde().generate(archive_path=archive_path)
+
+        with zipfile.ZipFile(archive_path) as zf:
+            names = zf.namelist()
+            style = zf.read("static/css/style.css")
+        self.assertEqual(names, sorted(names))
+        self.assertIn("posts/index.html", names)
+        with open("static/css/style.css", "rb") as f:
+            self.assertEqual(style, f.read())
+
+    def test_archives_are_reproducible(self):
+        for suffix in [".tar", ".tar.gz", ".zip"]:
+            first = Path(self.tmp_dir, f"first{suffix}")
+            second = Path(self.tmp_dir, f"second{suffix}")
+            Hyde().generate(archive_path=first)
+            Path("static/css/style.css").touch()
+            Hyde().generate(archive_path=second)
+            self.assertEqual(file_hash(first), file_hash(second))
+
+    def test_archives_do_not_depend_on_file_order(self):
+        for post in Path("content/posts").iterdir():
+            post.unlink()
+        shutil.copytree(".", "../other")
+        for project, numbers in [(".", range(12)), ("../other", reversed(range(12)))]:
+            for number in numbers:
+                Path(project, "content/posts", f"post-{number}.md").write_text(POST.format(number=number))
+
+        first = Path(self.tmp_dir, "first.tar.gz")
+        second = Path(self.tmp_dir, "second.tar.gz")
+        Hyde().generate(archive_path=first)
+        os.chdir("../other")
+        with mock.patch("hyde.hyde.os.walk", reversed_walk):
+            Hyde().generate(archive_path=second)
+        self.assertEqual(file_hash(first), file_hash(second))
@@ -0,0 +1,82 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from hyde.fileio import read_files, write_files, copy_files
+
+
+class TestFileIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_then_read_files_keeps_order(self):
+        files = [(self.tmp_dir / f"dir{i % 3}" / f"page{i}.html", f"page {i}") for i in range(50)]
+        write_files(files, max_in_flight=4)
+
+        contents = read_files([path for path, _ in files], max_in_flight=4)
+        self.assertEqual(contents, [content for _, content in files])
+
+    def test_write_files_creates_each_directory_once(self):
+        files = [(self.tmp_dir / "posts" / f"page{i}.html", "") for i in range(10)]
+        with mock.patch("hyde.fileio.os.makedirs") as m:
+            with mock.patch("hyde.fileio._write_file"):
+                write_files(files)
+        m.assert_called_once_with(self.tmp_dir / "posts", exist_ok=True)
+
+    def test_in_flight_operations_are_bounded(self):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def slow_read(path):
+            with lock:
+                in_flight.append(path)
+                peak.append(len(in_flight))
+            time.sleep(0.005)
+            with lock:
+                in_flight.remove(path)
+            return path
+
+        with mock.patch("hyde.fileio._read_file", slow_read):
+            results = read_files(list(range(40)), max_in_flight=3)
+
+        self.assertEqual(results, list(range(40)))
+        self.assertLessEqual(max(peak), 3)
+
+    def test_copy_files(self):
+        sources = [(self.tmp_dir / "src" / f"file{i}.css", f"body {i}") for i in range(5)]
+        write_files(sources)
+        copies = [(src, self.tmp_dir / "dst" / "css" / src.name) for src, _ in sources]
+        copy_files(copies)
+
+        self.assertEqual(read_files([dst for _, dst in copies]), [content for _, content in sources])
+
+    def test_failure_stops_remaining_calls(self):
+        lock = threading.Lock()
+        started = []
+        in_flight = []
+
+        def failing_read(path):
+            with lock:
+                started.append(path)
+                in_flight.append(path)
+            time.sleep(0.005)
+            with lock:
+                in_flight.remove(path)
+            if path == 2:
+                raise OSError("disk full")
+            return path
+
+        with mock.patch("hyde.fileio._read_file", failing_read):
+            with self.assertRaises(OSError):
+                read_files(list(range(100)), max_in_flight=4)
+
+        self.assertEqual(in_flight, [])
+        self.assertLess(len(started), 100)
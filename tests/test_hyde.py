@@ -1,12 +1,25 @@
+import shutil
+import subprocess
+import sys
 import unittest
 from unittest import mock
 
 from pathlib import Path
 from bs4 import BeautifulSoup
 
-from hyde import Hyde
+from hyde import Hyde, HydeError
+from hyde.hyde import generate_sites
 from .utils import *
 
+LOCALES_CONFIG = """
+site-name: Sample Site
+locales:
+  - name: en
+    content: content
+    url-prefix: /
+  - name: de
+"""
+
 
 class TestHyde(unittest.TestCase):
     def setUp(self):
@@ -36,4 +49,111 @@ class TestHyde(unittest.TestCase):
         soup = BeautifulSoup(rendered_html, features="html.parser")
 
         assert_expected_hrefs_in_soup(soup, ["/posts/index.html", "/index.html", "/about.html"])
-        
\ No newline at end of file
+
+    def test_hyde_import_does_not_load_subsystems(self):
+        # the cli module is imported for every invocation of `hyde`, keep it cheap
+        heavy_modules = ["jinja2", "markdown", "yaml", "watchdog", "hyde.server"]
+        code = f"import sys, hyde.hyde; print([m for m in {heavy_modules!r} if m in sys.modules])"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        self.assertEqual(out.stdout.strip(), "[]")
+
+
+class TestHydeSites(ScaffoldedSiteTestCase):
+    def add_german_locale(self):
+        Path("config.yaml").write_text(LOCALES_CONFIG)
+        shutil.copytree("content", "content-de")
+
+    def test_from_config_without_locales(self):
+        sites = Hyde.from_config()
+        self.assertEqual(len(sites), 1)
+        self.assertEqual(sites[0].url_prefix, "")
+
+    def test_from_config_with_locales(self):
+        self.add_german_locale()
+        en, de = Hyde.from_config()
+
+        self.assertEqual(en.url_prefix, "")
+        self.assertEqual(en.content_dir, Path("content"))
+        self.assertEqual(de.url_prefix, "/de")
+        self.assertEqual(de.content_dir, Path("content-de"))
+        self.assertIs(en.jinja2_env, de.jinja2_env)
+
+    def test_generate_locales_into_one_output(self):
+        self.add_german_locale()
+        generate_sites(Hyde.from_config())
+
+        self.assertTrue(Path("output/index.html").is_file())
+        self.assertTrue(Path("output/posts/my-first-post.html").is_file())
+        self.assertTrue(Path("output/static/css/style.css").is_file())
+        soup = BeautifulSoup(Path("output/de/index.html").read_text(), features="html.parser")
+        assert_expected_hrefs_in_soup(soup, ["/de/index.html", "/de/posts/index.html"])
+        soup = BeautifulSoup(Path("output/de/posts/index.html").read_text(), features="html.parser")
+        assert_expected_hrefs_in_soup(soup, ["/de/posts/my-first-post.html"])
+
+    def test_check_reports_locale_content_dir(self):
+        self.add_german_locale()
+        shutil.rmtree("content-de")
+        _, de = Hyde.from_config()
+
+        with self.assertRaises(HydeError) as cm:
+            de.check()
+        self.assertIn("'content-de'", str(cm.exception))
+
+    def test_from_config_rejects_duplicate_url_prefixes(self):
+        Path("config.yaml").write_text(LOCALES_CONFIG + "    url-prefix: /\n")
+        with self.assertRaises(HydeError):
+            Hyde.from_config()
+
+    def test_from_config_rejects_static_url_prefix(self):
+        Path("config.yaml").write_text("locales:\n  - name: static\n")
+        with self.assertRaises(HydeError):
+            Hyde.from_config()
+
+    def test_generate_sites_rejects_overlapping_locale_output(self):
+        self.add_german_locale()
+        generate_sites(Hyde.from_config())
+        before = Path("output/index.html").read_text()
+
+        # the en site at '/' writes the pages in content/de where the de locale writes its own
+        Path("content/de").mkdir()
+        Path("content/de/x.md").write_text("title: X\nurlstub: x\n---\nx")
+
+        with self.assertRaises(HydeError) as cm:
+            generate_sites(Hyde.from_config())
+        self.assertIn("de/index.html", str(cm.exception))
+        # the previous output is left alone
+        self.assertEqual(Path("output/index.html").read_text(), before)
+
+    def test_generate_sites_rejects_pages_over_static_assets(self):
+        Path("config.yaml").write_text("locales:\n  - name: en\n    content: content\n    url-prefix: /static/css\n")
+        Path("content/style.md").write_text("title: Style\nurlstub: style\n---\n")
+        Path("static/css/style.html").write_text("")
+
+        with self.assertRaises(HydeError) as cm:
+            generate_sites(Hyde.from_config())
+        self.assertIn("static assets", str(cm.exception))
+
+    def test_generate_single_locale_fails(self):
+        self.add_german_locale()
+        generate_sites(Hyde.from_config())
+        en, de = Hyde.from_config()
+
+        with self.assertRaises(HydeError):
+            en.generate()
+        self.assertTrue(Path("output/de/index.html").is_file())
+
+    def test_generate_multiple_projects(self):
+        shutil.copytree(".", "../other")
+        jinja2_envs = {}
+        sites = Hyde.from_config(".", jinja2_envs) + Hyde.from_config("../other", jinja2_envs)
+        generate_sites(sites)
+
+        self.assertEqual(len(jinja2_envs), 2)
+        self.assertTrue(Path("output/posts/my-first-post.html").is_file())
+        self.assertTrue(Path("../other/output/posts/my-first-post.html").is_file())
+
+    def test_archive_of_multiple_projects_fails(self):
+        shutil.copytree(".", "../other")
+        with self.assertRaises(HydeError):
+            generate_sites(Hyde.from_config(".") + Hyde.from_config("../other"), archive_path=Path("site.zip"))
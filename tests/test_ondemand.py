@@ -0,0 +1,89 @@
+from pathlib import Path
+from unittest import mock
+from bs4 import BeautifulSoup
+
+from hyde import Hyde
+from hyde.ondemand import OnDemandSite, OnDemandProject
+from .utils import *
+
+EXTRA_POST = """
+author: Hyde
+date: 2021-03-02
+title: Second post
+urlstub: second-post
+---
+Another one.
+"""
+
+
+class TestOnDemandSite(ScaffoldedSiteTestCase):
+    def test_routes_cover_pages_and_indices(self):
+        site = OnDemandSite(Hyde())
+        self.assertCountEqual(site.urls, ["/index.html", "/posts/index.html", "/posts/my-first-post.html"])
+
+    def test_render_matches_generate(self):
+        h = Hyde()
+        h.generate()
+        site = OnDemandSite(h)
+
+        for url in site.urls:
+            with open(h.output_dir / url.lstrip("/")) as f:
+                self.assertEqual(site.render(url), f.read())
+
+    def test_render_directory_url_serves_index(self):
+        site = OnDemandSite(Hyde())
+        soup = BeautifulSoup(site.render("/posts/"), features="html.parser")
+        assert_expected_hrefs_in_soup(soup, ["/posts/my-first-post.html", "/index.html"])
+
+    def test_render_unknown_url(self):
+        site = OnDemandSite(Hyde())
+        self.assertIsNone(site.render("/static/css/style.css"))
+
+    def test_related_pages_computed_on_first_post_render(self):
+        h = Hyde()
+        with mock.patch.object(h.related_index, "update", wraps=h.related_index.update) as m:
+            site = OnDemandSite(h)
+            site.invalidate()
+            site.render("/index.html")
+            m.assert_not_called()
+            site.render("/posts/my-first-post.html")
+        m.assert_called_once()
+
+    def test_render_is_cached(self):
+        site = OnDemandSite(Hyde())
+        with mock.patch.object(site, "_render_page", wraps=site._render_page) as m:
+            site.render("/index.html")
+            site.render("/index.html")
+        self.assertEqual(m.call_count, 1)
+
+    def test_cache_evicts_least_recently_used(self):
+        site = OnDemandSite(Hyde(), cache_size=2)
+        site.render("/index.html")
+        site.render("/posts/index.html")
+        site.render("/index.html")
+        site.render("/posts/my-first-post.html")
+        self.assertEqual(list(site._cache.keys()), ["/index.html", "/posts/my-first-post.html"])
+
+    def test_invalidate_picks_up_new_content(self):
+        site = OnDemandSite(Hyde())
+        site.render("/posts/index.html")
+        Path("content/posts/second-post.md").write_text(EXTRA_POST)
+
+        site.invalidate()
+
+        self.assertIn("/posts/second-post.html", site.urls)
+        soup = BeautifulSoup(site.render("/posts/index.html"), features="html.parser")
+        assert_expected_hrefs_in_soup(soup, ["/posts/second-post.html"])
+
+    def test_project_renders_all_locales(self):
+        Path("config.yaml").write_text("locales:\n  - name: en\n    content: content\n    url-prefix: /\n  - name: de\n")
+        Path("content").rename("content-de")
+        Path("content").mkdir()
+        Path("content-de/index.md").rename("content/index.md")
+
+        project = OnDemandProject(Hyde.from_config())
+
+        self.assertIsNotNone(project.render("/index.html"))
+        self.assertIsNotNone(project.render("/de/posts/"))
+        self.assertIsNone(project.render("/de/index.html"))
+        self.assertIsNone(project.render("/posts/index.html"))
@@ -85,4 +85,13 @@ class PaginatorTests(unittest.TestCase):
         soup = self.souped_index(paginator)
 
         assert_expected_hrefs_in_soup(soup, ["/posts/test-title-stub.html", "/posts/test-post-2.html", "/posts/test-post-3.html"])
-        assert_expected_a_texts_in_soup(soup, ["Test post", "Test post 2", "Test post 3"])
\ No newline at end of file
+        assert_expected_a_texts_in_soup(soup, ["Test post", "Test post 2", "Test post 3"])
+
+    def test_paginator_url_prefix(self):
+        paginator = Paginator(name="posts", content=self.pages, items_per_page=2, url_prefix="/de")
+        self.assertEqual(paginator.url, "/de/posts/")
+
+        index = next(paginator)
+        self.assertEqual(index.url, "/de/posts/index.html")
+        self.assertEqual(index.items[0].url, "/de/posts/test-title-stub.html")
+        self.assertEqual(next(paginator).url, "/de/posts/index2.html")
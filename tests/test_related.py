@@ -0,0 +1,148 @@
+from pathlib import Path
+from unittest import mock
+import unittest
+from bs4 import BeautifulSoup
+
+from hyde import Hyde
+import hyde.related
+from hyde.related import RelatedIndex
+from .utils import *
+
+RELATED_FILES = [
+    {
+        "file_path": Path("content/posts/python.md"),
+        "content": """
+title: Packaging Python projects
+urlstub: python-packaging
+tags: [python, packaging]
+---
+Poetry builds wheels for python projects.
+""",
+    },
+    {
+        "file_path": Path("content/posts/poetry.md"),
+        "content": """
+title: Publishing with poetry
+urlstub: poetry-publishing
+tags: [python, packaging]
+---
+Upload wheels built by poetry.
+""",
+    },
+    {
+        "file_path": Path("content/posts/bread.md"),
+        "content": """
+title: Baking sourdough bread
+urlstub: sourdough
+tags: [baking]
+---
+Feed the starter, knead the dough and bake the bread.
+""",
+    },
+]
+
+
+def numbered_post(number, topic):
+    return {
+        "file_path": Path(f"content/posts/post-{number}.md"),
+        "content": f"""
+title: Post {number} about {topic}
+urlstub: post-{number}
+---
+Words on {topic} number{number}.
+""",
+    }
+
+
+class TestRelatedIndex(unittest.TestCase):
+    def setUp(self):
+        self.pages = [page_from_file_str(p) for p in RELATED_FILES]
+
+    def test_related_pages_are_most_similar(self):
+        RelatedIndex().update(self.pages)
+        python, poetry, bread = self.pages
+
+        self.assertEqual(python.related, [poetry])
+        self.assertEqual(poetry.related, [python])
+        self.assertEqual(bread.related, [])
+
+    def test_related_pages_limited_to_top_k(self):
+        pages = [page_from_file_str(p) for p in TEST_PAGE_FILES] + self.pages
+        RelatedIndex(top_k=1).update(pages)
+
+        for page in pages:
+            self.assertLessEqual(len(page.related), 1)
+            self.assertNotIn(page, page.related)
+
+    def test_unchanged_pages_are_not_recomputed(self):
+        index = RelatedIndex()
+        index.update(self.pages)
+        pages = [page_from_file_str(p) for p in RELATED_FILES]
+
+        with mock.patch.object(index, "_score") as m:
+            index.update(pages)
+        m.assert_not_called()
+        self.assertEqual(pages[0].related, [pages[1]])
+
+    def test_changed_pages_reuse_cached_vectors(self):
+        index = RelatedIndex()
+        index.update(self.pages)
+        changed = dict(RELATED_FILES[2], content=RELATED_FILES[2]["content"] + "\nPython bread?")
+        pages = self.pages[:2] + [page_from_file_str(changed)]
+
+        with mock.patch("hyde.related._tokenize", wraps=hyde.related._tokenize) as m:
+            index.update(pages)
+        tokenized = [c.args[0] for c in m.call_args_list]
+        self.assertNotIn("Packaging Python projects", tokenized)
+        self.assertIn("Baking sourdough bread", tokenized)
+
+    def test_edited_page_only_rescores_that_page(self):
+        topics = ["gardening", "cooking", "cycling", "chess", "sailing", "baking", "running", "poetry", "opera", "golf"]
+        files = [numbered_post(i, topic) for i, topic in enumerate(topics * 4)]
+        index = RelatedIndex(top_k=2)
+        index.update([page_from_file_str(f) for f in files])
+
+        # post 0 moves from gardening to cycling
+        files[0] = numbered_post(0, "cycling")
+        pages = [page_from_file_str(f) for f in files]
+        edited_hash = hyde.related._page_hash(pages[0])
+        with mock.patch.object(index, "_score", wraps=index._score) as m:
+            index.update(pages)
+
+        m.assert_called_once_with(edited_hash)
+        self.assertIn(pages[2], pages[0].related)
+        self.assertIn(pages[0], pages[2].related)
+        self.assertNotIn(pages[0], pages[10].related)
+
+    def test_pages_with_common_tags_are_related(self):
+        words = ["oven", "flour", "pandas", "numpy", "yeast", "django", "sugar", "asyncio", "butter", "pytest"]
+        files = []
+        for i in range(20):
+            tag = ["python", "baking"][i % 2]
+            files.append({
+                "file_path": Path(f"content/posts/post-{i}.md"),
+                "content": f"""
+title: Notes {i}
+urlstub: post-{i}
+tags: [{tag}]
+---
+Some notes on {words[i % 10]} and {words[(i * 3) % 10]}.
+""",
+            })
+        pages = [page_from_file_str(f) for f in files]
+        RelatedIndex().update(pages)
+
+        for page in pages:
+            self.assertEqual(len(page.related), 5)
+            for related in page.related:
+                self.assertEqual(related.meta.tags, page.meta.tags)
+
+    def test_rendered_post_links_related_posts(self):
+        non_paged, paged = Hyde()._sort_content_pages(self.pages)
+        h = Hyde()
+        h.jinja2_env = get_jinja2_env()
+
+        rendered = {str(path): html for _, html, path in h._render_content_to_html(non_paged, paged)}
+        soup = BeautifulSoup(rendered["posts/python-packaging.html"], features="html.parser")
+
+        assert_expected_hrefs_in_soup(soup, ["/posts/poetry-publishing.html"])
@@ -0,0 +1,102 @@
+import http.client
+import socketserver
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from watchdog.events import FileModifiedEvent, FileSystemEvent
+
+from hyde.server import FileChangedFunctionHandler, OnDemandRequestHandler
+
+PAGES = {"/posts/index.html": "<p>posts</p>", "/post.html": "<p>post</p>"}
+
+
+def render(path):
+    if path == "/broken.html":
+        raise ValueError("template error")
+    if path.endswith("/"):
+        path = f"{path}index.html"
+    return PAGES.get(path)
+
+
+class TestOnDemandRequestHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root_dir = Path(self.tmp_dir.name)
+        root_dir.joinpath("config.yaml").write_text("secret: true")
+        static_dir = root_dir.joinpath("static")
+        static_dir.joinpath("css").mkdir(parents=True)
+        static_dir.joinpath("css/style.css").write_text("body {}")
+
+        self.httpd = socketserver.TCPServer(
+            ("127.0.0.1", 0),
+            lambda *args, **kwargs: OnDemandRequestHandler(*args, **kwargs, directory=static_dir, render=render),
+        )
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmp_dir.cleanup()
+
+    def request(self, method, path):
+        conn = http.client.HTTPConnection(*self.httpd.server_address)
+        conn.request(method, path)
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_get_rendered_page(self):
+        response, body = self.request("GET", "/post.html")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<p>post</p>")
+
+    def test_head_rendered_page(self):
+        response, body = self.request("HEAD", "/post.html")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Length"), str(len("<p>post</p>")))
+        self.assertEqual(body, b"")
+
+    def test_paginator_without_trailing_slash_redirects(self):
+        response, _ = self.request("GET", "/posts")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/posts/")
+
+    def test_render_error_returns_traceback(self):
+        response, body = self.request("GET", "/broken.html")
+        self.assertEqual(response.status, 500)
+        self.assertIn(b"ValueError: template error", body)
+
+    def test_static_assets_are_served_from_disk(self):
+        response, body = self.request("GET", "/static/css/style.css")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"body {}")
+
+        response, body = self.request("HEAD", "/static/css/style.css")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"")
+
+    def test_only_static_assets_are_served_from_disk(self):
+        for path in ["/missing.html", "/config.yaml", "/css/style.css", "/static/../config.yaml"]:
+            response, _ = self.request("GET", path)
+            self.assertEqual(response.status, 404, path)
+
+        response, _ = self.request("HEAD", "/config.yaml")
+        self.assertEqual(response.status, 404)
+
+
+class TestFileChangedFunctionHandler(unittest.TestCase):
+    def test_ignores_events_that_do_not_change_files(self):
+        fn = mock.Mock()
+        handler = FileChangedFunctionHandler(fn)
+
+        opened = FileSystemEvent("content/index.md")
+        opened.event_type = "opened"
+        handler.on_any_event(opened)
+        fn.assert_not_called()
+
+        handler.on_any_event(FileModifiedEvent("content/index.md"))
+        fn.assert_called_once()
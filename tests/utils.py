@@ -1,14 +1,32 @@
 from pathlib import Path
+import os
+import shutil
+import tempfile
+import unittest
 import jinja2
 
 from unittest import mock
 from hyde.pages import ContentPage
+from hyde.hyde import SCAFFOLDING_DIR
 
 def get_jinja2_env():
     return jinja2.Environment(
         loader=jinja2.FileSystemLoader("src/hyde/scaffolding/templates"),
     ) 
 
+class ScaffoldedSiteTestCase(unittest.TestCase):
+    """ Runs each test inside a fresh copy of the scaffolding project """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.site_dir = os.path.join(self.tmp_dir, "site")
+        shutil.copytree(SCAFFOLDING_DIR, self.site_dir)
+        self.prev_cwd = os.getcwd()
+        os.chdir(self.site_dir)
+
+    def tearDown(self):
+        os.chdir(self.prev_cwd)
+        shutil.rmtree(self.tmp_dir)
+
 def page_from_file_str(test_file: str):
     with mock.patch('hyde.pages.open', mock.mock_open(read_data=test_file["content"])) as m:
         return ContentPage.from_file(test_file["file_path"], Path("content"))